@@ -1,206 +1,615 @@
 import polib
-from openai import OpenAI
+from openai import AsyncOpenAI, RateLimitError, APITimeoutError, APIConnectionError, BadRequestError
+import httpx
 import os
-import concurrent.futures
-from threading import Lock
+import ssl
+import asyncio
+import email.utils
+import functools
 import time
 import json
-from itertools import cycle
+import pickle
+import random
+from itertools import count
 from dotenv import load_dotenv
 
+# Shared SSL context and per-key clients, so connections are reused across calls
+_SHARED_SSL_CTX = ssl.create_default_context()
+_CLIENTS = {}
+
+def _get_client(api_key, max_workers=4):
+    """
+    Get (or create) the cached OpenAI client for the given API key.
+    The connection pool is sized from max_workers so concurrent calls don't hit PoolTimeout.
+    SDK retries are disabled; rate limits and connection errors are retried by the callers.
+    """
+    client = _CLIENTS.get(api_key)
+    if client is None:
+        client = _CLIENTS[api_key] = AsyncOpenAI(
+            base_url="https://api.groq.com/openai/v1",
+            api_key=api_key,
+            max_retries=0,
+            http_client=httpx.AsyncClient(
+                verify=_SHARED_SSL_CTX,
+                limits=httpx.Limits(
+                    max_connections=max(32, max_workers * 4),
+                    max_keepalive_connections=max(16, max_workers * 2),
+                    keepalive_expiry=60.0
+                ),
+                timeout=httpx.Timeout(connect=10, read=60, write=30, pool=30)
+            )
+        )
+    return client
+
+async def _close_clients():
+    """Close all cached clients, which are bound to the event loop that created them"""
+    clients = list(_CLIENTS.values())
+    _CLIENTS.clear()
+    for client in clients:
+        await client.close()
+
+def partial_file_path(output_file):
+    """Path of the sidecar file holding translations not yet written to output_file"""
+    return output_file + ".partial.jsonl"
+
+def load_partial_translations(output_file):
+    """Load (msgctxt, msgid) -> msgstr pairs left in the sidecar file by an interrupted run"""
+    translations = {}
+    partial_file = partial_file_path(output_file)
+    if os.path.exists(partial_file):
+        with open(partial_file, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    delta = json.loads(line)
+                except json.JSONDecodeError:
+                    # The last line may be truncated if the run was killed mid-write
+                    continue
+                translations[(delta.get("msgctxt"), delta["msgid"])] = delta["msgstr"]
+    return translations
+
+# Bumped whenever the pickled mapping changes shape, so stale caches are reparsed
+_TRANSLATIONS_CACHE_VERSION = 2
+
+def translations_cache_path(output_file):
+    """Path of the pickled (msgctxt, msgid) -> msgstr cache for output_file"""
+    return output_file + ".cache.pickle"
+
+def translations_from_po(po):
+    """
+    (msgctxt, msgid) -> msgstr for the entries a saved .po file keeps a msgstr for, so the
+    in-memory file and a reparse of it give the same mapping. Plural entries are
+    written as msgstr[n] only, and obsolete entries are never reused.
+    """
+    return {
+        (entry.msgctxt, entry.msgid): entry.msgstr
+        for entry in po
+        if not entry.obsolete and not entry.msgid_plural
+    }
+
+def save_translations_cache(output_file, translations):
+    """Pickle translations, keyed by the current mtime of output_file"""
+    try:
+        with open(translations_cache_path(output_file), 'wb') as f:
+            pickle.dump(
+                (_TRANSLATIONS_CACHE_VERSION, os.path.getmtime(output_file), translations),
+                f,
+                protocol=pickle.HIGHEST_PROTOCOL
+            )
+    except OSError as e:
+        print(f"Could not write translations cache: {e}")
+
+def load_existing_translations(output_file):
+    """
+    Load (msgctxt, msgid) -> msgstr pairs from output_file, using the pickled cache
+    instead of parsing the file when its mtime hasn't changed.
+    """
+    mtime = os.path.getmtime(output_file)
+    try:
+        with open(translations_cache_path(output_file), 'rb') as f:
+            version, cached_mtime, translations = pickle.load(f)
+        if version == _TRANSLATIONS_CACHE_VERSION and cached_mtime == mtime:
+            return translations
+    except (OSError, pickle.UnpicklingError, EOFError, ValueError, TypeError):
+        pass
+    translations = translations_from_po(polib.pofile(output_file, wrapwidth=0))
+    save_translations_cache(output_file, translations)
+    return translations
+
+@functools.lru_cache(maxsize=1)
+def _load_api_keys():
+    """Load API keys from .env file, once per process"""
+    try:
+        # Load environment variables from .env file
+        load_dotenv()
+        
+        # Get API keys from environment variable
+        env_keys = os.getenv('GROQ_API_KEYS')
+        if env_keys:
+            # Remove brackets and split the string into a list
+            keys = tuple(key for key in env_keys.strip('[]').replace(' ', '').split(',') if key)
+            if keys:
+                print(f"Loaded {len(keys)} API keys")
+                return keys
+                
+        print("No API keys found in .env file, falling back to api_keys.json")
+        
+        # Fall back to json file if .env is not set up
+        if os.path.exists('api_keys.json'):
+            with open('api_keys.json', 'r') as f:
+                data = json.load(f)
+                return tuple(data.get('api_keys', []))
+                
+        return ("YOUR_DEFAULT_API_KEY",)  # Replace with your default key
+        
+    except Exception as e:
+        print(f"Error loading API keys: {e}")
+        return ("YOUR_DEFAULT_API_KEY",)  # Replace with your default key
+
 class APIKeyManager:
     def __init__(self):
-        self.api_keys = self.load_api_keys()
-        self.key_cycle = cycle(self.api_keys)
-        self.lock = Lock()
-        
-    def load_api_keys(self):
-        """Load API keys from .env file"""
-        try:
-            # Load environment variables from .env file
-            load_dotenv()
-            
-            # Get API keys from environment variable
-            env_keys = os.getenv('GROQ_API_KEYS')
-            if env_keys:
-                # Remove brackets and split the string into a list
-                keys = env_keys.strip('[]').replace(' ', '').split(',')
-                print(f"API keys: {keys}")
-                if keys:
-                    return keys
-                    
-            print("No API keys found in .env file, falling back to api_keys.json")
-            
-            # Fall back to json file if .env is not set up
-            if os.path.exists('api_keys.json'):
-                with open('api_keys.json', 'r') as f:
-                    data = json.load(f)
-                    return data.get('api_keys', [])
-                    
-            return ["YOUR_DEFAULT_API_KEY"]  # Replace with your default key
-            
-        except Exception as e:
-            print(f"Error loading API keys: {e}")
-            return ["YOUR_DEFAULT_API_KEY"]  # Replace with your default key
+        self.api_keys = _load_api_keys()
+        # Keys are only rotated from the event loop, so no lock is needed
+        self._next = count().__next__
+        # Monotonic timestamps until which rate limited keys should be skipped
+        self.cooldowns = {}
     
-    def get_next_key(self):
-        """Get next API key in rotation"""
-        with self.lock:
-            return next(self.key_cycle)
+    async def get_next_key(self):
+        """Get next API key in rotation, skipping keys that are cooling down"""
+        while True:
+            now = time.monotonic()
+            for _ in range(len(self.api_keys)):
+                key = self.api_keys[self._next() % len(self.api_keys)]
+                if self.cooldowns.get(key, 0) <= now:
+                    return key
+            # All keys are cooling down, wait for the first one to become available
+            await asyncio.sleep(max(0, min(self.cooldowns.values()) - now))
+
+    def cool_down(self, api_key, wait_time):
+        """Skip api_key in rotation for the next wait_time seconds"""
+        until = time.monotonic() + wait_time
+        if self.cooldowns.get(api_key, 0) < until:
+            self.cooldowns[api_key] = until
 
 class TranslationManager:
-    def __init__(self, pot_file, output_file):
+    def __init__(self, pot_file, output_file, max_workers=4, target_language="es", existing_translations=None):
         self.pot_file = pot_file
         self.output_file = output_file
-        self.lock = Lock()
+        self.max_workers = max_workers
+        # Created inside the running event loop by translate_pot_file_async
+        self.lock = asyncio.Lock()
+        # Translations keyed by (msgctxt, msgid, target_language), so repeated strings hit the API once
+        self.translation_cache = {
+            (msgctxt, msgid, target_language): msgstr
+            for (msgctxt, msgid), msgstr in (existing_translations or {}).items()
+            if msgstr.strip()
+        }
         self.processed_count = 0
         self.skipped_count = 0
+        self.failed_count = 0
         self.total_entries = len(pot_file)
         self.api_key_manager = APIKeyManager()
+        # New translations are appended to a sidecar file every save_every entries or
+        # save_interval seconds; the full file is only written by save_progress()
+        self.partial_file = partial_file_path(output_file)
+        self.dirty_entries = []
+        self._partial = None
+        self.save_every = 50
+        self.save_interval = 10
+        self.last_save_ts = time.monotonic()
         
-    def save_progress(self):
-        with self.lock:
+    async def save_progress(self):
+        """Save the full file and remove the sidecar, whose translations it now contains"""
+        async with self.lock:
             self.pot_file.save(self.output_file)
+            save_translations_cache(self.output_file, translations_from_po(self.pot_file))
+            self.dirty_entries = []
+            if self._partial is not None:
+                self._partial.close()
+                self._partial = None
+            if os.path.exists(self.partial_file):
+                os.remove(self.partial_file)
+            self.last_save_ts = time.monotonic()
+
+    def _flush_partial(self):
+        """Append translations made since the last flush to the sidecar file (caller holds the lock)"""
+        if self.dirty_entries:
+            if self._partial is None:
+                self._partial = open(self.partial_file, 'a', buffering=1, encoding='utf-8')
+            for entry in self.dirty_entries:
+                delta = {"msgctxt": entry.msgctxt, "msgid": entry.msgid, "msgstr": entry.msgstr}
+                self._partial.write(json.dumps(delta, ensure_ascii=False) + "\n")
+            self.dirty_entries = []
+        self.last_save_ts = time.monotonic()
+
+    def _save_if_due(self):
+        """Flush if enough entries or time have passed since the last flush (caller holds the lock)"""
+        if (self.processed_count % self.save_every == 0
+                or time.monotonic() - self.last_save_ts > self.save_interval):
+            self._flush_partial()
             
-    def update_progress(self, skipped=False):
-        with self.lock:
+    async def update_progress(self, skipped=False, entry=None, failed=False):
+        async with self.lock:
             self.processed_count += 1
             if skipped:
                 self.skipped_count += 1
+            elif failed:
+                self.failed_count += 1
+            elif entry is not None:
+                self.dirty_entries.append(entry)
             progress = (self.processed_count / self.total_entries) * 100
             print(f"Progress: {self.processed_count}/{self.total_entries} entries processed ({progress:.1f}%)")
+            self._save_if_due()
     
-    def get_next_api_key(self):
-        return self.api_key_manager.get_next_key()
+    async def get_next_api_key(self):
+        return await self.api_key_manager.get_next_key()
+
+@functools.lru_cache(maxsize=32)
+def _system_prompt(target_language):
+    """System prompt for single text translation, built once per language"""
+    return (
+        "You are a translation assistant. Translate the text to " + target_language + " with these rules:\n"
+        "Provide ONLY the translation\n"
+        "No greetings, no questions, no explanations\n"
+        "No additional words or sentences before/after translation\n"
+        "Match the original text's exact formatting\n"
+        "No suggestions or alternatives\n"
+        "No confirmation questions\n"
+        "No 'Here's the translation' type phrases"
+    )
+
+@functools.lru_cache(maxsize=32)
+def _batch_system_prompt(target_language):
+    """System prompt for batch translation, built once per language"""
+    return (
+        "You are a translation assistant. Translate each string of the JSON array to " + target_language + " with these rules:\n"
+        "Return a JSON object of the form {\"translations\": [...]} with the translated strings in the same order, nothing else\n"
+        "For items given as {\"context\": ..., \"text\": ...}, translate only the text and use the context to disambiguate it\n"
+        "Provide ONLY the translations\n"
+        "No greetings, no questions, no explanations\n"
+        "Match each original text's exact formatting\n"
+        "No suggestions or alternatives"
+    )
 
-def translate_text(text, target_language="es", max_retries=3, api_key=None):
+# Backoff without a Retry-After header: 5, 10, 20, 40, 60 seconds (plus jitter) over MAX_RETRIES attempts
+_RATE_LIMIT_BACKOFF_BASE = 5
+_RATE_LIMIT_BACKOFF_CAP = 60
+MAX_RETRIES = 6
+
+def _retry_after(error, attempt):
+    """
+    Seconds to wait after a rate limit error. The SDK's own retries are disabled,
+    so this honors retry-after-ms and Retry-After (seconds or HTTP date) the same
+    way, falling back to capped exponential backoff with jitter.
+    """
+    response = getattr(error, 'response', None)
+    headers = response.headers if response is not None else {}
+    try:
+        return float(headers.get('retry-after-ms')) / 1000
+    except (TypeError, ValueError):
+        pass
+    retry_after = headers.get('retry-after')
+    try:
+        return float(retry_after)
+    except (TypeError, ValueError):
+        pass
+    try:
+        retry_at = email.utils.parsedate_to_datetime(retry_after)
+        return max(0.0, retry_at.timestamp() - time.time())
+    except (TypeError, ValueError):
+        pass
+    return min(_RATE_LIMIT_BACKOFF_CAP, _RATE_LIMIT_BACKOFF_BASE * 2 ** attempt + random.uniform(0, 1))
+
+async def _handle_rate_limit(error, attempt, max_retries, api_key, manager=None):
+    """
+    Put a rate limited key on cooldown and return the key to retry with.
+    With a manager, the retry moves on to the next key that isn't cooling down;
+    without one, this sleeps out the cooldown and retries the same key.
+    """
+    wait_time = _retry_after(error, attempt)
+    if manager is None:
+        print(f"\nRate limit reached for API key. Waiting {wait_time:.1f} seconds before retry {attempt + 1}/{max_retries}...")
+        await asyncio.sleep(wait_time)
+        return api_key
+    print(f"\nRate limit reached for API key. Cooling it down for {wait_time:.1f} seconds, retry {attempt + 1}/{max_retries} with the next key...")
+    manager.api_key_manager.cool_down(api_key, wait_time)
+    return await manager.get_next_api_key()
+
+async def _wait_for_connection_retry(attempt, max_retries):
+    """Short pause before retrying a request that timed out or failed to connect"""
+    wait_time = random.uniform(1, 2)
+    print(f"\nConnection error. Waiting {wait_time:.1f} seconds before retry {attempt + 1}/{max_retries}...")
+    await asyncio.sleep(wait_time)
+
+async def translate_text_async(text, target_language="es", max_retries=MAX_RETRIES, api_key=None, max_workers=4, manager=None, sem=None):
+    """
+    Translate text using OpenAI's API with rate limit handling, returning the
+    original text if the translation fails.
+    See _translate_text_async for the parameters.
+    """
+    translated_text = await _translate_text_async(text, target_language, max_retries, api_key, max_workers, manager, sem)
+    return text if translated_text is None else translated_text
+
+async def _translate_text_async(text, target_language="es", max_retries=MAX_RETRIES, api_key=None, max_workers=4, manager=None, sem=None):
     """
     Translate text using OpenAI's API with rate limit handling.
     :param text: Text to translate
     :param target_language: Target language code (e.g., 'es' for Spanish)
-    :param max_retries: Maximum number of retries for rate limit errors
+    :param max_retries: Maximum number of retries for rate limit and connection errors
     :param api_key: API key to use for this request
-    :return: Translated text
+    :param max_workers: Number of concurrent workers, used to size the connection pool
+    :param manager: TranslationManager used to rotate away from rate limited keys
+    :param sem: asyncio.Semaphore bounding the number of concurrent requests
+    :return: Translated text, or None if the translation failed
     """
+    if sem is None:
+        sem = asyncio.Semaphore(max_workers)
     for attempt in range(max_retries):
         try:
-            client = OpenAI(
-                base_url="https://api.groq.com/openai/v1",
-                api_key=api_key
-            )
+            client = _get_client(api_key, max_workers)
             
-            response = client.chat.completions.create(
-                model="gemma2-9b-it",
-                messages=[
-                        {
-                            "role": "system", 
-                            "content": f"You are a translation assistant. Translate the text to {target_language} with these rules:\n"
-                                f"Provide ONLY the translation\n"
-                                f"No greetings, no questions, no explanations\n"
-                                f"No additional words or sentences before/after translation\n"
-                                f"Match the original text's exact formatting\n"
-                                f"No suggestions or alternatives\n"
-                                f"No confirmation questions\n"
-                                f"No 'Here's the translation' type phrases"
-                        },                    
-                        {"role": "user", "content": text}
-                ]
-            )
+            async with sem:
+                response = await client.chat.completions.create(
+                    model="gemma2-9b-it",
+                    messages=[
+                            {"role": "system", "content": _system_prompt(target_language)},
+                            {"role": "user", "content": text}
+                    ]
+                )
             return response.choices[0].message.content.strip()
+        except RateLimitError as e:
+            if attempt < max_retries - 1:
+                api_key = await _handle_rate_limit(e, attempt, max_retries, api_key, manager)
+                continue
+            print(f"Error translating text: {e}")
+            return None
+        except (APITimeoutError, APIConnectionError) as e:
+            if attempt < max_retries - 1:
+                await _wait_for_connection_retry(attempt, max_retries)
+                continue
+            print(f"Error translating text: {e}")
+            return None
         except Exception as e:
-            error_message = str(e).lower()
-            if any(phrase in error_message for phrase in ['rate limit', 'too many requests', '429']):
-                if attempt < max_retries - 1:
-                    wait_time = 60  # Wait for 1 minute
-                    print(f"\nRate limit reached for API key. Waiting {wait_time} seconds before retry {attempt + 1}/{max_retries}...")
-                    time.sleep(wait_time)
-                    continue
             print(f"Error translating text: {e}")
-            return text
-    return text
+            return None
+    return None
 
-def translate_entry(args):
+async def translate_text_batch_async(texts, target_language="es", max_retries=MAX_RETRIES, api_key=None, max_workers=4, manager=None, sem=None, contexts=None):
     """
-    Translate a single entry with the given parameters
+    Translate several texts in a single request, falling back to per-item translation
+    if the response can't be matched back to the input.
+    :param texts: List of texts to translate
+    :param target_language: Target language code (e.g., 'es' for Spanish)
+    :param max_retries: Maximum number of retries for rate limit and connection errors
+    :param api_key: API key to use for this request
+    :param max_workers: Number of concurrent workers, used to size the connection pool
+    :param manager: TranslationManager used to rotate away from rate limited keys
+    :param sem: asyncio.Semaphore bounding the number of concurrent requests
+    :param contexts: Optional msgctxt for each text, sent to the model to disambiguate it
+    :return: List of translated texts in the same order as texts, or None if the request failed;
+        after a per-item fallback, texts that failed to translate are None
+    """
+    if sem is None:
+        sem = asyncio.Semaphore(max_workers)
+    items = [
+        {"context": context, "text": text} if context else text
+        for text, context in zip(texts, contexts or [None] * len(texts))
+    ]
+    for attempt in range(max_retries):
+        try:
+            client = _get_client(api_key, max_workers)
+
+            async with sem:
+                response = await client.chat.completions.create(
+                    model="gemma2-9b-it",
+                    messages=[
+                            {"role": "system", "content": _batch_system_prompt(target_language)},
+                            {"role": "user", "content": json.dumps(items, ensure_ascii=False)}
+                    ],
+                    response_format={"type": "json_object"}
+                )
+            translations = json.loads(response.choices[0].message.content)
+            if isinstance(translations, dict):
+                translations = translations.get("translations")
+            if (isinstance(translations, list) and len(translations) == len(texts)
+                    and all(isinstance(t, str) for t in translations)):
+                return [t.strip() for t in translations]
+            print("Batch translation did not match the request, falling back to per-item translation")
+            break
+        except json.JSONDecodeError as e:
+            print(f"Could not parse batch translation: {e}")
+            break
+        except BadRequestError as e:
+            # JSON mode rejects responses the model failed to format as JSON
+            print(f"Batch translation was rejected, falling back to per-item translation: {e}")
+            break
+        except RateLimitError as e:
+            if attempt < max_retries - 1:
+                api_key = await _handle_rate_limit(e, attempt, max_retries, api_key, manager)
+                continue
+            print(f"Error translating batch: {e}")
+            return None
+        except (APITimeoutError, APIConnectionError) as e:
+            if attempt < max_retries - 1:
+                await _wait_for_connection_retry(attempt, max_retries)
+                continue
+            print(f"Error translating batch: {e}")
+            return None
+        except Exception as e:
+            print(f"Error translating batch: {e}")
+            return None
+    return [
+        await _translate_text_async(text, target_language, max_retries, api_key, max_workers, manager, sem)
+        for text in texts
+    ]
+
+async def translate_batch_async(groups, target_language, manager, sem):
+    """
+    Translate a chunk of entry groups (each sharing a msgctxt and msgid) with a single request
     """
-    entry, target_language, manager = args
     try:
-        if entry.msgstr.strip() == "":
-            api_key = manager.get_next_api_key()
-            translated_text = translate_text(entry.msgid, target_language, max_retries=3, api_key=api_key)
-            entry.msgstr = translated_text
-            manager.update_progress()
-        else:
-            manager.update_progress(skipped=True)
-            
-        manager.save_progress()
-        return entry.msgid, entry.msgstr
+        pending = []
+        for entries in groups:
+            translated_text = manager.translation_cache.get((entries[0].msgctxt, entries[0].msgid, target_language))
+            if translated_text is None:
+                pending.append(entries)
+                continue
+            for entry in entries:
+                entry.msgstr = translated_text
+                await manager.update_progress(entry=entry)
+
+        if pending:
+            api_key = await manager.get_next_api_key()
+            translations = await translate_text_batch_async(
+                [entries[0].msgid for entries in pending],
+                target_language,
+                contexts=[entries[0].msgctxt for entries in pending],
+                max_retries=MAX_RETRIES,
+                api_key=api_key,
+                max_workers=manager.max_workers,
+                manager=manager,
+                sem=sem
+            )
+            if translations is None:
+                translations = [None] * len(pending)
+            for entries, translated_text in zip(pending, translations):
+                if translated_text is None:
+                    # Leave msgstr empty so the next run retries these entries
+                    for entry in entries:
+                        await manager.update_progress(failed=True)
+                    continue
+                manager.translation_cache[(entries[0].msgctxt, entries[0].msgid, target_language)] = translated_text
+                for entry in entries:
+                    entry.msgstr = translated_text
+                    await manager.update_progress(entry=entry)
+    except Exception as e:
+        print(f"Error processing batch: {e}")
+
+def _save_partial_progress(pot_file, output_file):
+    """Best-effort save of whatever has been translated so far"""
+    try:
+        pot_file.save(output_file)
+        print("Partial progress has been saved.")
     except Exception as e:
-        print(f"Error processing entry: {e}")
-        return entry.msgid, ""
+        print(f"Could not save partial progress: {e}")
 
-def translate_pot_file(file_path, target_language="es", output_file="translated.po", max_workers=3):
+def translate_pot_file(file_path, target_language="es", output_file="translated.po", max_workers=3, batch_size=10):
     """
     Translate a .pot file into the specified language using concurrent processing.
     :param file_path: Path to the .pot file
     :param target_language: Target language code
     :param output_file: Path to save the translated .po file
-    :param max_workers: Maximum number of concurrent translation workers
+    :param max_workers: Maximum number of concurrent translation requests
+    :param batch_size: Number of unique strings sent per translation request
+    """
+    asyncio.run(translate_pot_file_async(file_path, target_language, output_file, max_workers, batch_size))
+
+async def translate_pot_file_async(file_path, target_language="es", output_file="translated.po", max_workers=3, batch_size=10):
+    """
+    Translate a .pot file on the running event loop; see translate_pot_file for the parameters.
     """
+    pot_file = None
     try:
         # Load the .pot file
-        pot_file = polib.pofile(file_path)
+        # wrapwidth=0 disables line wrapping, which also makes every save cheaper
+        pot_file = polib.pofile(file_path, wrapwidth=0)
         
         # Try to load existing translations
         existing_translations = {}
+        partial_translations = {}
         try:
             if os.path.exists(output_file):
                 print(f"Found existing translation file: {output_file}")
-                existing_po = polib.pofile(output_file)
-                existing_translations = {entry.msgid: entry.msgstr for entry in existing_po}
+                existing_translations = load_existing_translations(output_file)
                 print(f"Loaded {len(existing_translations)} existing translations")
+
+            # Replay translations from an interrupted run that never reached the full save
+            partial_translations = load_partial_translations(output_file)
+            if partial_translations:
+                existing_translations.update(partial_translations)
+                print(f"Recovered {len(partial_translations)} translations from {partial_file_path(output_file)}")
                 
+            if existing_translations:
                 # Apply existing translations to pot_file
                 applied_count = 0
                 for entry in pot_file:
-                    if entry.msgid in existing_translations and existing_translations[entry.msgid].strip():
-                        entry.msgstr = existing_translations[entry.msgid]
+                    key = (entry.msgctxt, entry.msgid)
+                    if key in existing_translations and existing_translations[key].strip():
+                        entry.msgstr = existing_translations[key]
                         applied_count += 1
                 print(f"Applied {applied_count} existing translations from previous run")
         except Exception as e:
             print(f"Could not load existing translations: {e}")
 
         # Create translation manager
-        manager = TranslationManager(pot_file, output_file)
+        manager = TranslationManager(
+            pot_file,
+            output_file,
+            max_workers=max_workers,
+            target_language=target_language,
+            existing_translations=existing_translations
+        )
         
-        # Prepare entries for translation
-        entries_to_translate = []
+        # Prepare entries for translation, grouped by (msgctxt, msgid) so each unique string is translated once
+        entries_by_key = {}
         for entry in pot_file:
-            # Only add entries that don't have translations or have empty translations
-            if not entry.msgstr.strip():
-                entries_to_translate.append((entry, target_language, manager))
+            # Only translate entries with an empty (or whitespace only) msgstr, skipping fuzzy,
+            # obsolete and header entries, and plural entries whose msgstr polib never writes
+            if (entry.msgstr.strip() or 'fuzzy' in entry.flags or entry.obsolete
+                    or not entry.msgid or entry.msgid_plural):
+                continue
+            entries_by_key.setdefault((entry.msgctxt, entry.msgid), []).append(entry)
+        groups = list(entries_by_key.values())
+        batches = (groups[i:i + batch_size] for i in range(0, len(groups), batch_size))
 
-        if not entries_to_translate:
+        if not groups:
+            # Translations recovered from the sidecar file still need to reach output_file
+            if partial_translations:
+                await manager.save_progress()
             print("All entries are already translated. Nothing to do.")
             return
 
-        print(f"Found {len(entries_to_translate)} entries that need translation")
+        entry_count = sum(len(entries) for entries in groups)
+        manager.total_entries = entry_count
+        batch_count = (len(groups) + batch_size - 1) // batch_size
+        print(f"Found {entry_count} entries that need translation ({len(groups)} unique strings in {batch_count} batches)")
         
-        # Process translations concurrently
-        with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
-            futures = [executor.submit(translate_entry, args) for args in entries_to_translate]
-            concurrent.futures.wait(futures)
+        # Process translations concurrently: sem bounds the requests in flight and
+        # at most 2 * max_workers batch tasks exist at any time
+        sem = asyncio.Semaphore(max_workers)
+        inflight = set()
+        try:
+            for batch in batches:
+                while len(inflight) >= max_workers * 2:
+                    _, inflight = await asyncio.wait(inflight, return_when=asyncio.FIRST_COMPLETED)
+                inflight.add(asyncio.ensure_future(translate_batch_async(batch, target_language, manager, sem)))
+            if inflight:
+                await asyncio.wait(inflight)
+        except (KeyboardInterrupt, asyncio.CancelledError):
+            print("\nInterrupted, cancelling pending translations...")
+            for task in inflight:
+                task.cancel()
+            # Let the cancelled tasks unwind before the clients are closed
+            await asyncio.gather(*inflight, return_exceptions=True)
+            raise
+
+        await manager.save_progress()
 
         print(f"\nTranslation completed. File saved as: {output_file}")
-        print(f"Summary: {manager.processed_count} total entries - {manager.skipped_count} skipped - {manager.processed_count - manager.skipped_count} newly translated")
+        newly_translated = manager.processed_count - manager.skipped_count - manager.failed_count
+        print(f"Summary: {manager.processed_count} total entries - {manager.skipped_count} skipped - {manager.failed_count} failed - {newly_translated} newly translated")
+        if manager.failed_count:
+            print("Failed entries were left untranslated and will be retried on the next run")
         
-    except Exception as e:
-        print(f"Error processing file: {e}")
-        try:
-            pot_file.save(output_file)
-            print("Partial progress has been saved.")
-        except:
-            pass
+    except (Exception, KeyboardInterrupt, asyncio.CancelledError) as e:
+        if isinstance(e, Exception):
+            print(f"Error processing file: {e}")
+        if pot_file is not None:
+            _save_partial_progress(pot_file, output_file)
+        # Errors are reported above, cancellations propagate to the caller
+        if not isinstance(e, Exception):
+            raise
+    finally:
+        await _close_clients()
 
 if __name__ == "__main__":
     # File paths
@@ -211,8 +620,8 @@ if __name__ == "__main__":
     language_code = "fa"  # Replace 'es' with your desired language code (e.g., 'fr', 'de')
 
     # Calculate optimal number of workers based on number of API keys
-    api_key_manager = APIKeyManager()
-    # recommended_workers = len(api_key_manager.api_keys)
+    api_keys = _load_api_keys()
+    # recommended_workers = len(api_keys)
     recommended_workers = 4
     print(f"Using {recommended_workers} workers based on available API keys")
 